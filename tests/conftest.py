@@ -1,7 +1,90 @@
+import json
+import socket
 import sys
+import threading
+import time
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on sys.path for imports during tests without installation
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from whatsminer_cli import core  # noqa: E402
+
+
+def _framed(obj) -> bytes:
+    body = json.dumps(obj).encode("utf-8")
+    return len(body).to_bytes(4, "little") + body
+
+
+def _start_echo_server(keep_alive: bool, drop=(), replies=None, close_delay=0.0):
+    """
+    Serve framed requests on localhost, answering each with {"echo": cmd, "conn": n}.
+    Commands listed in drop are read and then the connection is closed without a reply;
+    replies maps a command to the raw response body to frame instead of the echo.
+    Without keep_alive, close_delay seconds pass between the reply and the close, like
+    a miner whose FIN arrives after the client already considers the socket idle.
+    """
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    stats = {"connections": 0, "requests": [], "payloads": []}
+
+    def handle(conn, n):
+        with conn:
+            while True:
+                header = core.recvall(conn, 4)
+                if header is None:
+                    break
+                req = json.loads(core.recvall(conn, int.from_bytes(header, "little")))
+                stats["requests"].append(req["cmd"])
+                stats["payloads"].append(req)
+                if req["cmd"] in drop:
+                    break
+                if replies and req["cmd"] in replies:
+                    body = replies[req["cmd"]]
+                    conn.sendall(len(body).to_bytes(4, "little") + body)
+                else:
+                    conn.sendall(_framed({"echo": req["cmd"], "conn": n}))
+                if not keep_alive:
+                    time.sleep(close_delay)
+                    break
+
+    def serve():
+        while True:
+            try:
+                conn, _addr = server.accept()
+            except OSError:
+                return
+            stats["connections"] += 1
+            threading.Thread(target=handle, args=(conn, stats["connections"]), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server, stats
+
+
+@pytest.fixture
+def framed():
+    """Frame a JSON object the way the miner does (4-byte little-endian length + body)."""
+
+    return _framed
+
+
+@pytest.fixture
+def echo_server():
+    """Factory for local echo servers (see _start_echo_server); all are closed on teardown."""
+
+    servers = []
+
+    def start(*args, **kwargs):
+        server, stats = _start_echo_server(*args, **kwargs)
+        servers.append(server)
+        return server, stats
+
+    yield start
+    for server in servers:
+        server.close()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from whatsminer_cli import cli
+
+
+def _cli_args(tmp_path, *argv):
+    return ["--config", str(tmp_path / "missing.json"), "--password", "pwd", *argv]
+
+
+def test_read_hosts_file_comments_and_ports(tmp_path):
+    hosts_file = tmp_path / "miners.txt"
+    hosts_file.write_text(
+        "# rack 1\n"
+        "10.0.0.1\n"
+        "\n"
+        "10.0.0.2:4028  # custom port\n"
+        "   miner-3.local   \n",
+        encoding="utf-8",
+    )
+
+    assert cli.read_hosts_file(str(hosts_file), 4433) == [
+        ("10.0.0.1", 4433),
+        ("10.0.0.2", 4028),
+        ("miner-3.local", 4433),
+    ]
+
+
+@pytest.mark.parametrize("entry", ["10.0.0.1:abc", "10.0.0.1:", "10.0.0.1:70000", ":4433"])
+def test_read_hosts_file_rejects_bad_ports(tmp_path, entry):
+    hosts_file = tmp_path / "miners.txt"
+    hosts_file.write_text(f"10.0.0.9\n{entry}\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match=":2:"):
+        cli.read_hosts_file(str(hosts_file), 4433)
+
+
+def test_gather_many_respects_limit():
+    running = peak = 0
+
+    async def job(n):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if n == 3:
+            raise RuntimeError("boom")
+        return n
+
+    results = cli.gather_many((job(n) for n in range(8)), limit=2)
+
+    assert peak == 2
+    assert results[:3] == [0, 1, 2]
+    assert isinstance(results[3], RuntimeError)
+
+
+def test_main_hosts_file_queries_every_miner(tmp_path, capsys, echo_server):
+    servers = [echo_server(keep_alive=False)[0] for _ in range(2)]
+    addrs = ["%s:%d" % server.getsockname() for server in servers]
+    hosts_file = tmp_path / "miners.txt"
+    hosts_file.write_text("# fleet\n" + "".join(f"{addr}\n" for addr in addrs), encoding="utf-8")
+    try:
+        rc = cli.main(_cli_args(tmp_path, "--hosts-file", str(hosts_file), "--concurrency", "1", "call", "get.device.info"))
+    finally:
+        for server in servers:
+            server.close()
+
+    assert rc == 0
+    report = json.loads(capsys.readouterr().out)
+    assert list(report) == addrs
+    assert all(resp["echo"] == "get.device.info" for resp in report.values())
+
+
+@pytest.mark.parametrize("flag", ["--show-request", "--large-response"])
+def test_main_hosts_file_rejects_single_host_options(tmp_path, capsys, flag):
+    hosts_file = tmp_path / "miners.txt"
+    hosts_file.write_text("127.0.0.1\n", encoding="utf-8")
+
+    rc = cli.main(_cli_args(tmp_path, "--hosts-file", str(hosts_file), "call", "get.device.info", flag))
+
+    assert rc == 2
+    assert flag in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("body", [b'{"code": 0,  "msg": {"temp": 71.50}}', b""])
+def test_main_save_response_writes_raw_bytes(tmp_path, capsys, body, echo_server):
+    # Saved byte-for-byte: spacing and number formatting survive, an empty reply gives an empty file
+    server, _stats = echo_server(keep_alive=True, replies={"get.miner.status": body})
+    host, port = server.getsockname()
+    out_file = tmp_path / "resp.json"
+    try:
+        rc = cli.main(
+            _cli_args(tmp_path, "--host", host, "--port", str(port), "call", "get.miner.status", "--save-response", str(out_file))
+        )
+    finally:
+        server.close()
+
+    assert rc == 0
+    assert out_file.read_bytes() == body
+    assert "Saved response to" in capsys.readouterr().out
+
+
+def test_main_show_request_matches_sent_request(tmp_path, capsys, echo_server):
+    salt_reply = json.dumps({"code": 0, "msg": {"salt": "s4lt"}}).encode()
+    server, stats = echo_server(keep_alive=True, replies={"get.device.info": salt_reply})
+    host, port = server.getsockname()
+    pools = json.dumps({"pools": [{"url": "stratum+tcp://pool:3333", "user": "w1", "pass": "x"}]})
+    try:
+        rc = cli.main(
+            _cli_args(
+                tmp_path, "--host", host, "--port", str(port),
+                "call", "set.miner.pools", "--param-json", pools, "--ts", "1700000000", "--show-request",
+            )
+        )
+    finally:
+        server.close()
+
+    assert rc == 0
+    out = capsys.readouterr().out
+    preview = json.loads(out.split("=== Request preview ===\n", 1)[1].split("\n=======================", 1)[0])
+    sent = stats["payloads"][-1]
+    assert stats["requests"] == ["get.device.info", "set.miner.pools"]
+    assert preview["param"] == "<ENCRYPTED_BASE64>"
+    assert sent["param"] != preview["param"]
+    assert preview == dict(sent, param="<ENCRYPTED_BASE64>")
+    assert preview["token"] == sent["token"]
+
+
+@pytest.mark.parametrize("close_delay", [0.001, 0.005, 0.05])
+def test_main_set_survives_miner_closing_after_salt(tmp_path, echo_server, close_delay):
+    salt_reply = json.dumps({"code": 0, "msg": {"salt": "s4lt"}}).encode()
+    server, stats = echo_server(keep_alive=False, close_delay=close_delay, replies={"get.device.info": salt_reply})
+    host, port = server.getsockname()
+
+    rc = cli.main(_cli_args(tmp_path, "--host", host, "--port", str(port), "call", "set.miner.power", "--param", "3000"))
+
+    assert rc == 0
+    assert stats["requests"] == ["get.device.info", "set.miner.power"]
@@ -1,5 +1,7 @@
+import asyncio
 import base64
 import json
+import socket
 
 import pytest
 
@@ -28,6 +30,17 @@ def test_parse_scalar_conversions():
     assert parse_scalar("null") is None
     assert parse_scalar("0x10") == 16
     assert parse_scalar("text") == "text"
+    assert parse_scalar("-7") == -7
+    assert parse_scalar("1e3") == 1000.0
+    assert parse_scalar("1.2.3") == "1.2.3"
+    assert parse_scalar("0x") == "0x"
+    assert parse_scalar("1_000") == 1000
+    assert parse_scalar("0x1_0") == 16
+    assert parse_scalar("0x_10") == 16
+    assert parse_scalar("0X_ff") == 255
+    assert parse_scalar("1_0.5") == 10.5
+    assert parse_scalar("1__0") == "1__0"
+    assert parse_scalar("_1") == "_1"
 
 
 def test_resolve_param_inputs_priority(tmp_path):
@@ -43,6 +56,19 @@ def test_resolve_param_inputs_priority(tmp_path):
         resolve_param_inputs(None, None, tmp_path / "missing.json")
 
 
+def test_user_json_files_keep_nan_and_big_ints(tmp_path):
+    # Same semantics as --param-json, whichever JSON backend is installed
+    text = '{"limit": NaN, "id": 123456789012345678901234567890}'
+    param_file = tmp_path / "param.json"
+    param_file.write_text(text, encoding="utf-8")
+    conf_file = tmp_path / "miner-conf.json"
+    conf_file.write_text(text, encoding="utf-8")
+
+    for loaded in (resolve_param_inputs(None, None, str(param_file)), core.load_miner_conf(str(conf_file))):
+        assert loaded["id"] == 123456789012345678901234567890
+        assert loaded["limit"] != loaded["limit"]
+
+
 # Token generation should be deterministic for the same inputs
 
 def test_generate_token_deterministic():
@@ -105,3 +131,403 @@ def test_call_whatsminer_builds_set_request(monkeypatch):
 def test_call_whatsminer_requires_salt():
     with pytest.raises(ValueError):
         call_whatsminer("host", 1, "acc", "pwd", "set.miner.power")
+
+
+def test_generate_token_cache_matches_uncached():
+    cached = generate_token("set.miner.power", "passw0rd", "salt123", 1700000000)
+    again = generate_token("set.miner.power", "passw0rd", "salt123", 1700000000)
+    uncached = generate_token("set.miner.power", "passw0rd", "salt123", 1700000000, cache=False)
+
+    assert cached is again
+    assert cached == uncached
+
+
+class FakeSocket:
+    """Minimal socket stand-in that replays a response in small chunks."""
+
+    def __init__(self, response: bytes, chunk: int = 3):
+        self._response = bytearray(response)
+        self._chunk = chunk
+        self.sent = []
+        self.options = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def setsockopt(self, level, option, value):
+        self.options[(level, option)] = value
+
+    def sendall(self, data):
+        self.sent.append(bytes(data))
+
+    def recv(self, n, flags=0):
+        n = min(n, self._chunk)
+        data = bytes(self._response[:n])
+        del self._response[:n]
+        return data
+
+    def recv_into(self, buf, nbytes=0, flags=0):
+        data = self.recv(nbytes or len(buf), flags)
+        buf[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def test_send_request_and_receive_single_frame(monkeypatch, framed):
+    sock = FakeSocket(framed({"code": 0, "msg": {"salt": "abc"}}))
+    monkeypatch.setattr(core, "_connect", lambda host, port, timeout: sock)
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+
+    resp = core.send_request_and_receive("host", DEFAULT_PORT, {"cmd": "get.device.info", "param": "salt"})
+
+    assert resp == {"code": 0, "msg": {"salt": "abc"}}
+    assert len(sock.sent) == 1
+    frame = sock.sent[0]
+    assert int.from_bytes(frame[:4], "little") == len(frame) - 4
+    assert json.loads(frame[4:]) == {"cmd": "get.device.info", "param": "salt"}
+
+
+def test_recvall_handles_short_reads_and_eof():
+    assert core.recvall(FakeSocket(b"abcdefgh", chunk=3), 8) == b"abcdefgh"
+    assert core.recvall(FakeSocket(b"abc", chunk=2), 8) is None
+
+
+@pytest.mark.parametrize("keep_alive", [True, False])
+def test_miner_session_reuses_or_reconnects(keep_alive, echo_server):
+    server, stats = echo_server(keep_alive)
+    host, port = server.getsockname()
+    try:
+        with core.MinerSession(host, port, timeout=5) as session:
+            first = call_whatsminer(host, port, "super", "pwd", "get.device.info", session=session)
+            second = call_whatsminer(host, port, "super", "pwd", "get.miner.status", session=session)
+    finally:
+        server.close()
+
+    assert first["echo"] == "get.device.info"
+    assert second["echo"] == "get.miner.status"
+    assert stats["connections"] == (1 if keep_alive else 2)
+
+
+def test_async_call_whatsminer_fans_out(echo_server):
+    servers = [echo_server(keep_alive=False) for _ in range(3)]
+
+    async def sweep():
+        return await asyncio.gather(
+            *(
+                core.async_call_whatsminer(*server.getsockname(), "super", "pwd", "get.device.info", "miner", timeout=5)
+                for server, _stats in servers
+            )
+        )
+
+    try:
+        results = asyncio.run(sweep())
+    finally:
+        for server, _stats in servers:
+            server.close()
+
+    assert [r["echo"] for r in results] == ["get.device.info"] * 3
+
+
+def test_request_non_ascii_is_escaped_not_dropped():
+    data = core._dumps_ascii({"cmd": "set.miner.pools", "param": "wörker"})
+
+    assert data.isascii()
+    assert json.loads(data) == {"cmd": "set.miner.pools", "param": "wörker"}
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 17, 31, 32])
+def test_pkcs7_pad_table_matches_definition(size):
+    data = b"a" * size
+    padded = core.pkcs7_pad(data)
+    pad_len = 16 - size % 16
+
+    assert padded == data + bytes([pad_len]) * pad_len
+    assert core.pkcs7_pad(data, 8) == data + bytes([8 - size % 8]) * (8 - size % 8)
+
+
+def test_make_token_factory_matches_generate_token():
+    token_for = core.make_token_factory("set.miner.power", "passw0rd", "salt123")
+
+    for ts in (1700000000, 1700000001):
+        assert token_for(ts) == generate_token("set.miner.power", "passw0rd", "salt123", ts, cache=False)
+    assert token_for(1700000000) == token_for(1700000000)
+
+
+def test_json_backend_keeps_non_finite_floats_and_big_ints():
+    # Same bytes on the wire and the same parsed values with or without orjson
+    assert core._dumps_bytes({"v": float("nan"), "w": None}) == b'{"v":NaN,"w":null}'
+    assert core._encode_request({"cmd": "set.miner.power", "param": float("inf")})[4:] == (
+        b'{"cmd":"set.miner.power","param":Infinity}'
+    )
+    assert core._parse_response(b'{"id": 123456789012345678901234567890}') == {"id": 123456789012345678901234567890}
+
+
+def test_parse_response_from_receive_buffer():
+    assert core._parse_response(bytearray(b'{"code":0}')) == {"code": 0}
+    assert core._parse_response(bytearray()) == {}
+    assert core._parse_response(bytearray(b'{"msg":"ok\xff"}')) == {"msg": "ok"}
+    assert core._parse_response(bytearray(b"not json")) == {"raw": "not json"}
+
+
+def test_stdlib_loads_accepts_session_buffer(monkeypatch, echo_server):
+    # Without orjson the session's memoryview must parse on the fast path
+    buf = bytearray(b'{"code":0}  ')
+    assert core._json_loads(memoryview(buf)[:10]) == {"code": 0}
+
+    monkeypatch.setattr(core, "_loads", core._json_loads)
+    monkeypatch.setattr(core, "_parse_response", lambda body: core._loads(body))
+    server, _stats = echo_server(keep_alive=True)
+    with core.MinerSession(*server.getsockname(), timeout=5) as session:
+        assert session.call({"cmd": "get.device.info"})["echo"] == "get.device.info"
+
+
+@pytest.mark.parametrize("keep_alive", [True, False])
+def test_send_request_and_receive_pools_connections(monkeypatch, keep_alive, echo_server):
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+    server, stats = echo_server(keep_alive)
+    host, port = server.getsockname()
+    try:
+        first = core.send_request_and_receive(host, port, {"cmd": "get.device.info"}, timeout=5)
+        second = core.send_request_and_receive(host, port, {"cmd": "get.miner.status"}, timeout=5)
+    finally:
+        core.close_pooled_connections()
+        server.close()
+
+    assert (first["echo"], second["echo"]) == ("get.device.info", "get.miner.status")
+    assert stats["connections"] == (1 if keep_alive else 2)
+
+
+def test_connect_tries_each_address_and_caches_resolution(monkeypatch, echo_server):
+    server, _stats = echo_server(keep_alive=True)
+    host, port = server.getsockname()
+    refused = socket.socket()
+    refused.bind(("127.0.0.1", 0))
+    refused_addr = refused.getsockname()
+    refused.close()  # nothing listens here any more
+
+    lookups = []
+
+    def fake_getaddrinfo(name, port_, type=0):
+        lookups.append(name)
+        if name == "offline":
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", refused_addr)]
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", refused_addr),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (host, port)),
+        ]
+
+    monkeypatch.setattr(core.socket, "getaddrinfo", fake_getaddrinfo)
+    monkeypatch.setattr(core, "_ADDR_CACHE", {})
+    try:
+        for _ in range(2):
+            with core._connect("miner", port, 5) as sock:
+                assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        with pytest.raises(OSError):
+            core._connect("offline", port, 5)
+    finally:
+        server.close()
+
+    assert lookups == ["miner", "offline"]
+    assert list(core._ADDR_CACHE) == [("miner", port)]
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_generate_token_streamed_hash_matches_concatenation(cache):
+    token, digest = generate_token("set.miner.power", "пароль", "sält", 1700000000, cache=cache)
+    expected = core.sha256_digest_bytes("set.miner.powerпарольsält1700000000", cache=False)
+
+    assert digest == expected
+    assert token == base64.b64encode(expected).decode("ascii")[:8]
+
+
+def test_whatsminer_client_reuses_connection_and_buffer(echo_server):
+    server, stats = echo_server(keep_alive=True)
+    host, port = server.getsockname()
+    try:
+        with core.WhatsminerClient(host, port, "super", "pwd", timeout=5) as client:
+            first = client.call("get.device.info", "salt")
+            second = client.send({"cmd": "get.miner.status"})
+            sock = client.session._sock
+            assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    finally:
+        server.close()
+
+    assert (first["echo"], second["echo"]) == ("get.device.info", "get.miner.status")
+    assert stats["connections"] == 1
+
+
+@pytest.mark.parametrize(
+    "request_obj",
+    [
+        {"cmd": "get.device.info"},
+        {"cmd": "get.device.info", "param": "salt"},
+        {"cmd": "get.device.info", "param": 'quo"te'},
+        {"cmd": "get.device.info", "param": "back\\slash"},
+        {"cmd": "get.device.info", "param": "tab\t"},
+        {"cmd": "get.device.info", "param": "wörker"},
+        {"cmd": "set.miner.power", "param": 3200},
+        {"cmd": "set.miner.power", "ts": 1, "token": "abc", "account": "super"},
+    ],
+)
+def test_encode_request_matches_json(request_obj):
+    expected = json.dumps(request_obj, separators=(",", ":")).encode("ascii")
+    frame = core._encode_request(request_obj)
+    templated = core._dumps_simple_request(request_obj)
+
+    assert int.from_bytes(frame[:4], "little") == len(frame) - 4
+    assert frame[4:] == expected
+    assert templated is None or templated == expected
+
+
+def test_derive_and_encrypt_reuses_key_schedule():
+    param = {"pools": []}
+    core._get_ecb_cipher.cache_clear()
+
+    first = core._derive_and_encrypt("set.miner.pools", "pwd", "salt", 42, param)
+    second = core._derive_and_encrypt("set.miner.pools", "pwd", "salt", 42, param)
+
+    assert first == second
+    assert first[0] == generate_token("set.miner.pools", "pwd", "salt", 42, cache=False)[0]
+    assert core._get_ecb_cipher.cache_info().hits == 1
+
+
+class RecordingSocket:
+    """Socket stand-in for _connect that reports fixed kernel buffer sizes."""
+
+    default_bufsize = 0
+
+    def __init__(self, *args):
+        self.options = {}
+
+    def getsockopt(self, level, option):
+        return self.options.get((level, option), self.default_bufsize)
+
+    def setsockopt(self, level, option, value):
+        self.options[(level, option)] = value
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect(self, addr):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("default_bufsize, expected", [(8192, core.LARGE_RESPONSE_BUFSIZE), (131072, None)])
+def test_connect_only_grows_socket_buffers(monkeypatch, default_bufsize, expected):
+    monkeypatch.setattr(RecordingSocket, "default_bufsize", default_bufsize)
+    monkeypatch.setattr(core.socket, "socket", RecordingSocket)
+    monkeypatch.setattr(core, "_ADDR_CACHE", {("miner", 4433): [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 4433))]})
+
+    sock = core._connect("miner", 4433, 5, bufsize=core.LARGE_RESPONSE_BUFSIZE)
+
+    assert sock.options.get((socket.SOL_SOCKET, socket.SO_RCVBUF)) == expected
+    assert sock.options.get((socket.SOL_SOCKET, socket.SO_SNDBUF)) == expected
+    assert sock.options[(socket.IPPROTO_TCP, socket.TCP_NODELAY)] == 1
+
+
+def test_raw_mode_returns_response_bytes(monkeypatch, echo_server):
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+    server, _stats = echo_server(keep_alive=True)
+    host, port = server.getsockname()
+    try:
+        raw = core.send_request_and_receive(host, port, {"cmd": "get.miner.status"}, timeout=5, raw=True)
+        core.close_pooled_connections()  # the echo server serves one connection at a time
+        with core.MinerSession(host, port, timeout=5) as session:
+            session_raw = session.call({"cmd": "get.miner.status"}, raw=True)
+    finally:
+        server.close()
+
+    assert isinstance(raw, bytes) and isinstance(session_raw, bytes)
+    assert json.loads(raw)["echo"] == json.loads(session_raw)["echo"] == "get.miner.status"
+
+
+def test_miner_session_never_resends_signed_set_after_write(echo_server):
+    server, stats = echo_server(keep_alive=True, drop=("set.system.reboot", "get.miner.status"))
+    host, port = server.getsockname()
+    try:
+        with core.WhatsminerClient(host, port, "super", "pwd", timeout=5) as client:
+            client.call("get.device.info", "salt")
+            with pytest.raises(ConnectionError):
+                client.call("set.system.reboot", salt="salty")
+            client.call("get.device.info", "salt")
+            with pytest.raises(ConnectionError):
+                client.call("get.miner.status")
+    finally:
+        server.close()
+
+    # the get is retried once on a fresh connection, the reboot is not
+    assert stats["requests"] == [
+        "get.device.info",
+        "set.system.reboot",
+        "get.device.info",
+        "get.miner.status",
+        "get.miner.status",
+    ]
+
+
+def test_pooled_send_never_resends_signed_set(monkeypatch, echo_server):
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+    server, stats = echo_server(keep_alive=True, drop=("set.system.reboot",))
+    host, port = server.getsockname()
+    try:
+        core.send_request_and_receive(host, port, {"cmd": "get.device.info"}, timeout=5)
+        reboot = core._build_request("set.system.reboot", "super", "pwd", None, "salty", 1)
+        with pytest.raises(ConnectionError):
+            core.send_request_and_receive(host, port, reboot, timeout=5)
+    finally:
+        core.close_pooled_connections()
+        server.close()
+
+    assert stats["requests"] == ["get.device.info", "set.system.reboot"]
+
+
+def test_connection_pool_is_capped(monkeypatch, echo_server):
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+    monkeypatch.setattr(core, "_CONN_POOL_MAX", 2)
+    servers = [echo_server(keep_alive=True)[0] for _ in range(3)]
+    try:
+        for server in servers:
+            core.send_request_and_receive(*server.getsockname(), {"cmd": "get.device.info"}, timeout=5)
+        assert len(core._CONN_POOL) == 2
+        core.close_pooled_connections()
+        assert core._CONN_POOL == {}
+    finally:
+        for server in servers:
+            server.close()
+
+
+def test_pooled_send_opens_fresh_connection_for_set(monkeypatch, echo_server):
+    # The miner closes a few ms after replying: a pooled socket still looks idle
+    # when the set is written, so the set must not go out on it
+    monkeypatch.setattr(core, "_CONN_POOL", {})
+    server, stats = echo_server(keep_alive=False, close_delay=0.005)
+    host, port = server.getsockname()
+    try:
+        for _ in range(5):
+            call_whatsminer(host, port, "super", "pwd", "get.device.info", "salt", timeout=5)
+            resp = call_whatsminer(host, port, "super", "pwd", "set.miner.power", 3000, salt="salty", timeout=5)
+            assert resp["echo"] == "set.miner.power"
+    finally:
+        core.close_pooled_connections()
+
+    assert stats["requests"] == ["get.device.info", "set.miner.power"] * 5
+
+
+def test_miner_session_reconnects_before_set(echo_server):
+    server, stats = echo_server(keep_alive=False, close_delay=0.005)
+    host, port = server.getsockname()
+    with core.WhatsminerClient(host, port, "super", "pwd", timeout=5) as client:
+        for _ in range(5):
+            client.call("get.device.info", "salt")
+            assert client.call("set.miner.power", 3000, salt="salty")["echo"] == "set.miner.power"
+
+    assert stats["requests"] == ["get.device.info", "set.miner.power"] * 5
+    assert stats["connections"] == 10
@@ -3,10 +3,16 @@
 from .core import (
     DEFAULT_PORT,
     DEFAULT_TIMEOUT,
+    LARGE_RESPONSE_BUFSIZE,
+    MinerSession,
+    WhatsminerClient,
+    async_call_whatsminer,
     call_whatsminer,
+    close_pooled_connections,
     encrypt_param_aes_ecb_base64,
     generate_token,
     load_miner_conf,
+    make_token_factory,
     parse_scalar,
     resolve_param_inputs,
     send_request_and_receive,
@@ -15,10 +21,16 @@ from .core import (
 __all__ = [
     "DEFAULT_PORT",
     "DEFAULT_TIMEOUT",
+    "LARGE_RESPONSE_BUFSIZE",
+    "MinerSession",
+    "WhatsminerClient",
+    "async_call_whatsminer",
     "call_whatsminer",
+    "close_pooled_connections",
     "encrypt_param_aes_ecb_base64",
     "generate_token",
     "load_miner_conf",
+    "make_token_factory",
     "parse_scalar",
     "resolve_param_inputs",
     "send_request_and_receive",
@@ -1,21 +1,29 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
 
 from .core import (
     DEFAULT_PORT,
     DEFAULT_TIMEOUT,
-    _ENCRYPTED_COMMANDS,
+    LARGE_RESPONSE_BUFSIZE,
+    WhatsminerClient,
+    _KIND_ENCRYPTED,
+    _KIND_GET,
+    _build_request,
+    _command_kind,
+    _parse_response,
+    async_call_whatsminer,
     call_whatsminer,
-    generate_token,
     load_miner_conf,
-    now_ts_int,
     resolve_param_inputs,
 )
 
+DEFAULT_CONCURRENCY = 64
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -27,6 +35,16 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--login", help="Account name (e.g., super)")
     parser.add_argument("--password", help="Account password (overrides config)")
     parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="Socket timeout seconds")
+    parser.add_argument(
+        "--hosts-file",
+        help="File with one miner per line (host or host:port); runs the command against all of them concurrently",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of miners queried at once with --hosts-file (default {DEFAULT_CONCURRENCY})",
+    )
 
     sub = parser.add_subparsers(dest="action", required=True)
 
@@ -44,7 +62,12 @@ def build_parser() -> argparse.ArgumentParser:
     callp.add_argument("--salt", help="Salt value (optional). For set.* commands you should provide or obtain from get.device.info")
     callp.add_argument("--ts", type=int, help="Timestamp integer to use for token generation (optional)")
     callp.add_argument("--show-request", action="store_true", help="Print JSON request that will be sent (for debugging)")
-    callp.add_argument("--save-response", help="Save response JSON to file")
+    callp.add_argument("--save-response", help="Save response JSON to file (raw, as received from the miner)")
+    callp.add_argument(
+        "--large-response",
+        action="store_true",
+        help=f"Use socket buffers of at least {LARGE_RESPONSE_BUFSIZE // 1024} KB for big responses (e.g. get.miner.status); single-host mode only",
+    )
 
     return parser
 
@@ -54,6 +77,96 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
+def read_hosts_file(path: str, default_port: int) -> List[Tuple[str, int]]:
+    """Parse a hosts file: one 'host' or 'host:port' per line, '#' starts a comment."""
+
+    hosts: List[Tuple[str, int]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            entry = line.split("#", 1)[0].strip()
+            if not entry:
+                continue
+            if entry.count(":") == 1:
+                host, port_str = entry.split(":")
+                try:
+                    port = int(port_str)
+                except ValueError:
+                    port = 0
+                if not host or not 0 < port < 65536:
+                    raise ValueError(f"{path}:{lineno}: invalid host:port entry {entry!r}")
+                hosts.append((host, port))
+            else:
+                hosts.append((entry, default_port))
+    return hosts
+
+
+async def _gather(aws: Iterable[Awaitable[Any]], limit: Optional[int] = None) -> List[Any]:
+    if limit:
+        # Created inside the running loop; coroutines only start once they hold a slot
+        sem = asyncio.Semaphore(limit)
+
+        async def bounded(aw: Awaitable[Any]) -> Any:
+            async with sem:
+                return await aw
+
+        aws = [bounded(aw) for aw in aws]
+    return await asyncio.gather(*aws, return_exceptions=True)
+
+
+def gather_many(aws: Iterable[Awaitable[Any]], limit: Optional[int] = None) -> List[Any]:
+    """
+    Run awaitables concurrently, at most limit at a time (unbounded if None);
+    exceptions are returned in place of results.
+    """
+
+    return asyncio.run(_gather(aws, limit))
+
+
+async def _fleet_call(
+    host: str,
+    port: int,
+    account: str,
+    password: str,
+    cmd: str,
+    param_obj: Optional[Any],
+    salt: Optional[str],
+    ts: Optional[int],
+    timeout: int,
+) -> dict:
+    if _command_kind(cmd) != _KIND_GET and not salt:
+        info = await async_call_whatsminer(host, port, account, password, "get.device.info", "salt", timeout=timeout)
+        if isinstance(info.get("msg"), dict) and info["msg"].get("salt"):
+            salt = info["msg"]["salt"]
+    return await async_call_whatsminer(host, port, account, password, cmd, param_obj, salt=salt, ts=ts, timeout=timeout)
+
+
+def _run_fleet(args: argparse.Namespace, hosts: List[Tuple[str, int]], account: str, password: str) -> int:
+    if args.action == "get-salt":
+        cmd, param_obj, salt, ts = "get.device.info", args.param, None, None
+    else:
+        cmd, salt, ts = args.cmd, args.salt, args.ts
+        param_obj = resolve_param_inputs(args.param, args.param_json, args.param_file)
+
+    results = gather_many(
+        (_fleet_call(host, port, account, password, cmd, param_obj, salt, ts, args.timeout) for host, port in hosts),
+        limit=args.concurrency,
+    )
+
+    report: Dict[str, Any] = {}
+    failed = False
+    for (host, port), result in zip(hosts, results):
+        if isinstance(result, Exception):
+            failed = True
+            result = {"error": str(result) or type(result).__name__}
+        report[f"{host}:{port}"] = result
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if getattr(args, "save_response", None):
+        with open(args.save_response, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print("Saved response to", args.save_response)
+    return 1 if failed else 0
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     args = parse_args(argv)
 
@@ -63,11 +176,30 @@ def main(argv: Optional[list[str]] = None) -> int:
     account = args.login or conf.get("login") or "super"
     password = args.password or conf.get("password")
 
-    if host is None or password is None:
+    if (host is None and not args.hosts_file) or password is None:
         print("Error: host and password must be supplied either via CLI or miner-conf.json", file=sys.stderr)
         build_parser().print_help()
         return 2
 
+    if args.hosts_file:
+        if args.concurrency < 1:
+            print("Error: --concurrency must be at least 1", file=sys.stderr)
+            return 2
+        unsupported = [
+            flag
+            for flag, dest in (("--show-request", "show_request"), ("--large-response", "large_response"))
+            if getattr(args, dest, False)
+        ]
+        if unsupported:
+            print(f"Error: {', '.join(unsupported)} cannot be used with --hosts-file", file=sys.stderr)
+            return 2
+        try:
+            hosts = read_hosts_file(args.hosts_file, port)
+            return _run_fleet(args, hosts, account, password)
+        except Exception as exc:
+            print("Error:", exc, file=sys.stderr)
+            return 1
+
     if args.action == "get-salt":
         try:
             resp = call_whatsminer(host, port, account, password, "get.device.info", args.param, salt=None, ts=None, timeout=args.timeout)
@@ -86,43 +218,36 @@ def main(argv: Optional[list[str]] = None) -> int:
         cmd = args.cmd
         param_obj = resolve_param_inputs(args.param, args.param_json, args.param_file)
         provided_salt = args.salt
+        kind = _command_kind(cmd)
 
         try:
-            if cmd.startswith("set.") and not provided_salt:
-                print("Fetching salt from get.device.info ...")
-                info = call_whatsminer(host, port, account, password, "get.device.info", "salt", salt=None, ts=None, timeout=args.timeout)
-                if isinstance(info.get("msg"), dict) and info["msg"].get("salt"):
-                    provided_salt = info["msg"]["salt"]
-                    print("Obtained salt:", provided_salt)
-                else:
-                    print("Warning: Could not obtain salt automatically; please supply --salt", file=sys.stderr)
-
-            if args.show_request:
-                ts_to_use = args.ts if args.ts is not None else (now_ts_int() if cmd.startswith("set.") else None)
-                preview_req: Dict[str, Any] = {"cmd": cmd}
-                if cmd.startswith("set."):
-                    if provided_salt:
-                        token, _digest = generate_token(cmd, password, provided_salt, ts_to_use)
-                        preview_req.update({"ts": ts_to_use, "token": token, "account": account})
-                        if cmd in _ENCRYPTED_COMMANDS:
-                            preview_req["param"] = "<ENCRYPTED_BASE64>"
-                        elif param_obj is not None:
-                            preview_req["param"] = param_obj
+            # One client for the salt lookup and the command (a set.* reconnects, see MinerSession)
+            bufsize = LARGE_RESPONSE_BUFSIZE if args.large_response else None
+            with WhatsminerClient(host, port, account, password, timeout=args.timeout, sock_bufsize=bufsize) as client:
+                if kind != _KIND_GET and not provided_salt:
+                    print("Fetching salt from get.device.info ...")
+                    info = client.call("get.device.info", "salt")
+                    if isinstance(info.get("msg"), dict) and info["msg"].get("salt"):
+                        provided_salt = info["msg"]["salt"]
+                        print("Obtained salt:", provided_salt)
                     else:
-                        preview_req["note"] = "salt missing; token not computed"
-                else:
-                    if param_obj is not None:
-                        preview_req["param"] = param_obj
-                print("=== Request preview ===")
-                print(json.dumps(preview_req, indent=2, ensure_ascii=False))
-                print("=======================")
-
-            resp = call_whatsminer(host, port, account, password, cmd, param_obj, salt=provided_salt, ts=args.ts, timeout=args.timeout)
-            print(json.dumps(resp, indent=2, ensure_ascii=False))
-            if args.save_response:
-                with open(args.save_response, "w", encoding="utf-8") as f:
-                    json.dump(resp, f, indent=2, ensure_ascii=False)
-                print("Saved response to", args.save_response)
+                        print("Warning: Could not obtain salt automatically; please supply --salt", file=sys.stderr)
+
+                # Build the request once: the preview shows exactly what is sent
+                request = _build_request(cmd, account, password, param_obj, provided_salt, args.ts)
+                if args.show_request:
+                    preview_req = dict(request, param="<ENCRYPTED_BASE64>") if kind == _KIND_ENCRYPTED else request
+                    print("=== Request preview ===")
+                    print(json.dumps(preview_req, indent=2, ensure_ascii=False))
+                    print("=======================")
+
+                resp_bytes = client.send(request, raw=True)
+                print(json.dumps(_parse_response(resp_bytes), indent=2, ensure_ascii=False))
+                if args.save_response:
+                    # Archive the response as received instead of re-serializing the parsed copy
+                    with open(args.save_response, "wb") as f:
+                        f.write(resp_bytes)
+                    print("Saved response to", args.save_response)
 
         except Exception as exc:
             print("Error while calling API:", exc, file=sys.stderr)
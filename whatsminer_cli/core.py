@@ -1,16 +1,31 @@
 from __future__ import annotations
 
-import base64
+import asyncio
+import atexit
+import binascii
+import functools
 import hashlib
 import json
-import os
+import re
+import select
 import socket
 import struct
+import sys
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Literal, Optional, Tuple, Union, overload
+
+try:
+    import orjson  # optional fast JSON backend
+except ImportError:  # pragma: no cover
+    orjson = None
 
 DEFAULT_PORT = 4433
 DEFAULT_TIMEOUT = 10  # seconds
+LARGE_RESPONSE_BUFSIZE = 64 * 1024  # minimum SO_RCVBUF/SO_SNDBUF for bulky responses
+
+# 4-byte little-endian length prefix framing every request and response
+_LEN_STRUCT = struct.Struct("<I")
 
 
 class MissingAESCipher(ImportError):
@@ -38,7 +53,69 @@ def _load_aes_cipher():
     return cipher
 
 
-AES = _load_aes_cipher()
+# pycryptodome is imported on first encryption so get.* calls and CLI startup
+# don't pay for it. core.AES still resolves via the module __getattr__ below.
+_AES: Any = None
+
+
+def _get_aes() -> Any:
+    global _AES
+    if _AES is None:
+        _AES = _load_aes_cipher()
+    return _AES
+
+
+def __getattr__(name: str) -> Any:
+    if name == "AES":
+        return _get_aes()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _json_dumps_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_dumps_ascii(obj: Any) -> bytes:
+    # ensure_ascii=True escapes non-ASCII as \uXXXX, so the encode is lossless
+    return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def _json_loads(data: Union[bytes, bytearray, memoryview]) -> Any:
+    # json.loads takes bytes/bytearray but not the memoryview a session's
+    # receive buffer yields
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+# orjson only serializes: it parses integers beyond 64 bits into lossy floats,
+# so responses and files are always parsed with the stdlib (_loads).
+_loads = _json_loads
+
+if orjson is not None:
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+
+        try:
+            data = orjson.dumps(obj)
+        except TypeError:  # e.g. non-str keys or ints beyond 64 bits
+            return _json_dumps_bytes(obj)
+        if b"null" in data:
+            # orjson writes NaN/Infinity as null; let the stdlib decide
+            return _json_dumps_bytes(obj)
+        return data
+
+    def _dumps_ascii(obj: Any) -> bytes:
+        """Serialize obj to compact ASCII JSON bytes for the wire."""
+
+        data = _dumps_bytes(obj)
+        if data.isascii():
+            return data
+        return _json_dumps_ascii(obj)
+else:  # pragma: no cover
+    _dumps_bytes = _json_dumps_bytes
+    _dumps_ascii = _json_dumps_ascii
 
 
 def now_ts_int() -> int:
@@ -47,32 +124,107 @@ def now_ts_int() -> int:
     return int(time.time())
 
 
-def sha256_digest_bytes(s: str) -> bytes:
-    """Return sha256 digest bytes for input string s (utf-8)."""
+# Memoized hashing helpers. Cache entries hold password-derived material
+# (digests double as AES keys), so they only ever live in process memory.
+_HASH_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=_HASH_CACHE_SIZE)
+def _sha256_cached(concat: str) -> bytes:
+    return hashlib.sha256(concat.encode("utf-8")).digest()
+
 
+def sha256_digest_bytes(s: str, cache: bool = True) -> bytes:
+    """
+    Return sha256 digest bytes for input string s (utf-8).
+    Pass cache=False to keep the input and digest out of the in-process cache.
+    """
+
+    if cache:
+        return _sha256_cached(s)
     return hashlib.sha256(s.encode("utf-8")).digest()
 
 
+# Padding suffixes for the 16-byte AES block: _PKCS7_PAD[n] is n bytes of n.
+# Kept in-house on purpose: Crypto.Util.Padding.pad is pure Python, not a C
+# routine, and measured ~2.5x slower than this table lookup.
+_PKCS7_PAD = tuple(bytes([i]) * i for i in range(17))
+
+
 def pkcs7_pad(data: bytes, block_size: int = 16) -> bytes:
     """PKCS#7 pad bytes to block_size."""
 
+    if block_size == 16:
+        return data + _PKCS7_PAD[16 - (len(data) & 15)]
     pad_len = block_size - (len(data) % block_size)
     return data + bytes([pad_len]) * pad_len
 
 
-def generate_token(cmd: str, account_password: str, salt: str, ts: int) -> tuple[str, bytes]:
+def _token_from_hasher(h: Any, ts: int) -> tuple[str, bytes]:
+    h.update(str(ts).encode("ascii"))
+    digest = h.digest()
+    # 6 bytes encode to exactly the first 8 base64 chars of the full digest
+    token = binascii.b2a_base64(digest[:6], newline=False).decode("ascii")
+    return token, digest
+
+
+def _token_hasher(cmd: str, account_password: str, salt: str) -> Any:
+    h = hashlib.sha256(cmd.encode("utf-8"))
+    h.update(account_password.encode("utf-8"))
+    h.update(salt.encode("utf-8"))
+    return h
+
+
+# sha256 state pre-fed with cmd + password + salt; only ts changes between
+# calls, so callers copy() the prototype and hash just the ts suffix.
+# The prototypes must never be updated in place.
+_token_prefix = functools.lru_cache(maxsize=256)(_token_hasher)
+
+
+def _generate_token(cmd: str, account_password: str, salt: str, ts: int) -> tuple[str, bytes]:
+    return _token_from_hasher(_token_hasher(cmd, account_password, salt), ts)
+
+
+def make_token_factory(cmd: str, account_password: str, salt: str, cache: bool = True) -> Callable[[int], tuple[str, bytes]]:
+    """
+    Return a function ts -> (token, digest_bytes) for a fixed cmd/password/salt.
+    The cmd + password + salt prefix is hashed once; each call only hashes ts.
+    With cache=False the prefix state is not shared through the module cache.
+    """
+
+    base = _token_prefix(cmd, account_password, salt) if cache else _token_hasher(cmd, account_password, salt)
+
+    def token_for(ts: int) -> tuple[str, bytes]:
+        return _token_from_hasher(base.copy(), ts)
+
+    return token_for
+
+
+@functools.lru_cache(maxsize=_HASH_CACHE_SIZE)
+def _generate_token_cached(cmd: str, account_password: str, salt: str, ts: int) -> tuple[str, bytes]:
+    return make_token_factory(cmd, account_password, salt)(ts)
+
+
+def generate_token(cmd: str, account_password: str, salt: str, ts: int, cache: bool = True) -> tuple[str, bytes]:
     """
     Token per API v3.0.1:
       digest = sha256(cmd + password + salt + ts)  -> 32 raw bytes
       token  = base64(digest) first 8 chars
+    Results are memoized per (cmd, password, salt, ts); pass cache=False to bypass.
     Returns: (token_str, digest_bytes)
     """
 
-    concat = f"{cmd}{account_password}{salt}{ts}"
-    digest = sha256_digest_bytes(concat)
-    b64 = base64.b64encode(digest).decode("ascii")
-    token = b64[:8]
-    return token, digest
+    if cache:
+        return _generate_token_cached(cmd, account_password, salt, ts)
+    return _generate_token(cmd, account_password, salt, ts)
+
+
+# ECB cipher objects carry no per-message state, so one object per key can be
+# reused: the key schedule is computed once per key instead of once per call.
+@functools.lru_cache(maxsize=8)
+def _get_ecb_cipher(key: bytes) -> Any:
+    aes = _get_aes()
+    return aes.new(key, aes.MODE_ECB)
 
 
 def encrypt_param_aes_ecb_base64(param_obj: Any, aes_key_bytes: bytes) -> str:
@@ -86,57 +238,476 @@ def encrypt_param_aes_ecb_base64(param_obj: Any, aes_key_bytes: bytes) -> str:
 
     if aes_key_bytes is None:
         raise ValueError("AES key bytes required for encryption")
-    json_str = json.dumps(param_obj, separators=(",", ":"), ensure_ascii=False)
-    data = json_str.encode("utf-8")
-    padded = pkcs7_pad(data, 16)
-    cipher = AES.new(aes_key_bytes, AES.MODE_ECB)
-    ct = cipher.encrypt(padded)
-    return base64.b64encode(ct).decode("ascii")
+    data = _dumps_bytes(param_obj)
+    ct = _get_ecb_cipher(aes_key_bytes).encrypt(pkcs7_pad(data))
+    return binascii.b2a_base64(ct, newline=False).decode("ascii")
+
+
+# Ask the kernel to fill the whole buffer in one recv where supported; short
+# reads (timeouts use non-blocking sockets, signals) fall back to the loop.
+# Windows rejects MSG_WAITALL on non-blocking sockets, so it is left out there.
+_RECV_FLAGS = getattr(socket, "MSG_WAITALL", 0) if sys.platform != "win32" else 0
+
+
+def _recv_exact(sock: socket.socket, view: memoryview) -> bool:
+    """Fill view completely from sock; False on EOF."""
+
+    n = len(view)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got, _RECV_FLAGS)
+        if not k:
+            return False
+        got += k
+    return True
+
+
+def recvall(sock: socket.socket, n: int) -> Optional[bytearray]:
+    """Receive exactly n bytes into a preallocated buffer or return None on failure/EOF."""
+
+    buf = bytearray(n)
+    return buf if _recv_exact(sock, memoryview(buf)) else None
+
+
+# Printable ASCII except '"' and '\\': such strings need no JSON escaping.
+_PLAIN_JSON_STR_RE = re.compile(r'[ !#-\[\]-~]*')
+
+
+def _dumps_simple_request(request_obj: dict) -> Optional[bytes]:
+    """
+    Template the common {"cmd": str} / {"cmd": str, "param": str} request
+    (e.g. get.device.info) without the JSON encoder; None for anything else.
+    """
+
+    cmd = request_obj.get("cmd")
+    if type(cmd) is not str or not _PLAIN_JSON_STR_RE.fullmatch(cmd):
+        return None
+    if len(request_obj) == 1:
+        return b'{"cmd":"%s"}' % cmd.encode("ascii")
+    param = request_obj.get("param")
+    if len(request_obj) == 2 and type(param) is str and _PLAIN_JSON_STR_RE.fullmatch(param):
+        return b'{"cmd":"%s","param":"%s"}' % (cmd.encode("ascii"), param.encode("ascii"))
+    return None
+
+
+def _encode_request(request_obj: dict) -> bytes:
+    """Serialize and frame request_obj into the exact bytes sent on the wire."""
+
+    body = None
+    if orjson is None:  # orjson outruns the template; only the stdlib encoder is slower
+        body = _dumps_simple_request(request_obj)
+    if body is None:
+        body = _dumps_ascii(request_obj)
+    # Length prefix and body in one buffer so each request is a single send.
+    return _LEN_STRUCT.pack(len(body)) + body
+
+
+def _recv_frame(sock: socket.socket, rx_buf: Optional[bytearray] = None) -> Union[bytearray, memoryview]:
+    """
+    Read one length-prefixed response body.
+    If rx_buf is large enough the body is received into it and a memoryview
+    over it is returned; parse it before the buffer is reused.
+    """
+
+    header = recvall(sock, 4)
+    if header is None or len(header) < 4:
+        raise ConnectionError("Failed to read response length")
+    resp_len = _LEN_STRUCT.unpack(header)[0]
+    if resp_len == 0:
+        return bytearray()
+    if rx_buf is not None and resp_len <= len(rx_buf):
+        body: Union[bytearray, memoryview] = memoryview(rx_buf)[:resp_len]
+    else:
+        body = bytearray(resp_len)
+    if not _recv_exact(sock, memoryview(body)):
+        raise ConnectionError("Failed to read full response")
+    return body
+
+
+def _parse_response(resp_bytes: Union[bytes, bytearray, memoryview]) -> dict:
+    if not resp_bytes:
+        return {}
+    try:
+        return _loads(resp_bytes)
+    except Exception:
+        pass
+    resp_text = bytes(resp_bytes).decode("utf-8", errors="ignore")
+    try:
+        return json.loads(resp_text)
+    except Exception:
+        return {"raw": resp_text}
+
+
+# Idle connections kept per (host, port) so back-to-back get calls skip the TCP
+# handshake. A pooled socket is only reused if it is still idle; most miners
+# close after each response and are reconnected. That close may still be in
+# flight when the idle check runs, so signed set.* requests (which must not be
+# resent) always go out on a fresh connection.
+# The pool is capped so loops over many miners don't hoard file descriptors.
+_CONN_POOL: Dict[Tuple[str, int], socket.socket] = {}
+_CONN_POOL_MAX = 16
+_conn_pool_lock = threading.Lock()
+
+
+# (host, port) -> getaddrinfo results; an entry is dropped when no address
+# of that host accepts a connection so a moved miner gets resolved again.
+_ADDR_CACHE: Dict[Tuple[str, int], list] = {}
+_ADDR_CACHE_MAX = 32
+_addr_cache_lock = threading.Lock()
+
+
+def _resolve(host: str, port: int) -> list:
+    key = (host, port)
+    infos = _ADDR_CACHE.get(key)
+    if infos is None:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        with _addr_cache_lock:
+            if key not in _ADDR_CACHE and len(_ADDR_CACHE) >= _ADDR_CACHE_MAX:
+                del _ADDR_CACHE[next(iter(_ADDR_CACHE))]
+            _ADDR_CACHE[key] = infos
+    return infos
+
+
+def _ensure_sockbuf(sock: socket.socket, option: int, size: int) -> None:
+    # Only ever grow the buffer: on Linux an explicit SO_RCVBUF also turns off
+    # receive autotuning, so setting it to a value below the default would cap
+    # large transfers instead of speeding them up.
+    if sock.getsockopt(socket.SOL_SOCKET, option) < size:
+        sock.setsockopt(socket.SOL_SOCKET, option, size)
+
+
+def _connect(host: str, port: int, timeout: int, bufsize: Optional[int] = None) -> socket.socket:
+    """
+    Open a TCP connection to host:port, trying each resolved address in turn
+    like socket.create_connection, but resolving the name once per host.
+    bufsize, if given, raises SO_RCVBUF/SO_SNDBUF to at least that size before
+    connecting (the receive window is negotiated during the handshake).
+    """
+
+    error: Optional[OSError] = None
+    for family, socktype, proto, _canonname, sockaddr in _resolve(host, port):
+        sock = socket.socket(family, socktype, proto)
+        try:
+            if bufsize:
+                _ensure_sockbuf(sock, socket.SO_RCVBUF, bufsize)
+                _ensure_sockbuf(sock, socket.SO_SNDBUF, bufsize)
+            sock.settimeout(timeout)
+            sock.connect(sockaddr)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as exc:
+            sock.close()
+            error = exc
+            continue
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    with _addr_cache_lock:
+        _ADDR_CACHE.pop((host, port), None)
+    if error is not None:
+        raise error
+    raise OSError(f"getaddrinfo returned no addresses for {host}:{port}")
+
+
+def _is_stale(sock: socket.socket) -> bool:
+    # An idle connection that is readable has been closed by the peer (or
+    # carries stray data); either way it can't be used for a new request.
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
 
 
-def recvall(sock: socket.socket, n: int) -> Optional[bytes]:
-    """Receive exactly n bytes or return None on failure/EOF."""
+def _is_get_request(request_obj: dict) -> bool:
+    cmd = request_obj.get("cmd")
+    return isinstance(cmd, str) and _command_kind(cmd) == _KIND_GET
 
-    data = bytearray()
-    while len(data) < n:
-        chunk = sock.recv(n - len(data))
-        if not chunk:
-            return None
-        data.extend(chunk)
-    return bytes(data)
 
+def _may_resend(request_obj: dict, sent: bool) -> bool:
+    """
+    Whether a request that failed on a reused connection may be retried on a
+    new one: always if the frame was not fully written, otherwise only for get
+    commands. A set.* the miner already read (e.g. a reboot) must not run twice.
+    """
+
+    return not sent or _is_get_request(request_obj)
 
-def send_request_and_receive(host: str, port: int, request_obj: dict, timeout: int = DEFAULT_TIMEOUT) -> dict:
+
+def _get_conn(host: str, port: int, timeout: int, reuse: bool = True) -> Tuple[socket.socket, bool]:
+    """
+    Return (socket, reused) for host:port, preferring a pooled idle connection
+    unless reuse is False.
+    """
+
+    if not reuse:
+        return _connect(host, port, timeout), False
+    with _conn_pool_lock:
+        sock = _CONN_POOL.pop((host, port), None)
+    if sock is not None:
+        if not _is_stale(sock):
+            sock.settimeout(timeout)
+            return sock, True
+        sock.close()
+    return _connect(host, port, timeout), False
+
+
+def _release_conn(host: str, port: int, sock: socket.socket) -> None:
+    """Return a connection that finished a clean request/response to the pool."""
+
+    key = (host, port)
+    with _conn_pool_lock:
+        previous = _CONN_POOL.pop(key, None)
+        if len(_CONN_POOL) < _CONN_POOL_MAX:
+            _CONN_POOL[key] = sock
+            sock = None
+    if previous is not None:
+        previous.close()
+    if sock is not None:  # pool full
+        sock.close()
+
+
+def close_pooled_connections() -> None:
+    """Close all idle connections kept by send_request_and_receive."""
+
+    with _conn_pool_lock:
+        socks = list(_CONN_POOL.values())
+        _CONN_POOL.clear()
+    for sock in socks:
+        sock.close()
+
+
+atexit.register(close_pooled_connections)
+
+
+@overload
+def send_request_and_receive(
+    host: str, port: int, request_obj: dict, timeout: int = ..., raw: Literal[False] = ...
+) -> dict: ...
+@overload
+def send_request_and_receive(host: str, port: int, request_obj: dict, timeout: int = ..., *, raw: Literal[True]) -> bytes: ...
+@overload
+def send_request_and_receive(
+    host: str, port: int, request_obj: dict, timeout: int = ..., raw: bool = ...
+) -> Union[dict, bytes]: ...
+
+
+def send_request_and_receive(
+    host: str, port: int, request_obj: dict, timeout: int = DEFAULT_TIMEOUT, raw: bool = False
+) -> Union[dict, bytes]:
     """
     Send request_obj (JSON) to miner using TCP framing:
       - send 4-byte little-endian length + ASCII JSON
       - read 4-byte response length, then JSON
-    Returns parsed JSON dict (or {"raw": "..."} if parse fails).
-    """
-
-    req_str = json.dumps(request_obj, separators=(",", ":"), ensure_ascii=False)
-    req_bytes = req_str.encode("ascii", errors="ignore")  # API uses ASCII payload
-    length = len(req_bytes)
-    with socket.create_connection((host, port), timeout=timeout) as s:
-        s.sendall(struct.pack("<I", length))
-        s.sendall(req_bytes)
-        header = recvall(s, 4)
-        if header is None or len(header) < 4:
-            raise ConnectionError("Failed to read response length")
-        resp_len = struct.unpack("<I", header)[0]
-        if resp_len == 0:
-            return {}
-        resp_bytes = recvall(s, resp_len)
-        if resp_bytes is None:
-            raise ConnectionError("Failed to read full response")
-        resp_text = resp_bytes.decode("utf-8", errors="ignore")
+    Idle connections are pooled per host:port between get calls (see
+    close_pooled_connections); signed set.* requests always use a fresh
+    connection and are never resent.
+    Returns parsed JSON dict (or {"raw": "..."} if parse fails), or the
+    response body bytes unparsed with raw=True.
+    """
+
+    frame = _encode_request(request_obj)
+    reuse = _is_get_request(request_obj)
+    while True:
+        s, reused = _get_conn(host, port, timeout, reuse)
+        sent = False
         try:
-            return json.loads(resp_text)
-        except Exception:
-            return {"raw": resp_text}
+            s.sendall(frame)
+            sent = True
+            resp_bytes = _recv_frame(s)
+        except ConnectionError:
+            s.close()
+            if reused and _may_resend(request_obj, sent):
+                continue  # pooled connection was dead, retry on a fresh one
+            raise
+        except BaseException:
+            s.close()
+            raise
+        _release_conn(host, port, s)
+        return bytes(resp_bytes) if raw else _parse_response(resp_bytes)
+
+
+def _enable_keepalive(sock: socket.socket, idle: int = 60) -> None:
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):  # Linux and other POSIX; absent on macOS/Windows
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+
+
+class MinerSession:
+    """
+    Reusable connection to a single miner for scripted/bulk calls.
+    The TCP connection is kept open (with TCP keepalive) between calls; if the
+    miner has closed it, the request goes out on a new connection. Signed set.*
+    requests always reconnect first, since a close still in flight can't be
+    detected, and are never resent once written (see _may_resend).
+    Responses are received into a buffer reused across calls.
+    sock_bufsize makes the kernel socket buffers at least that large (e.g.
+    LARGE_RESPONSE_BUFSIZE) for big responses where the OS default is smaller.
+    """
+
+    RX_BUFFER_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        timeout: int = DEFAULT_TIMEOUT,
+        sock_bufsize: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock_bufsize = sock_bufsize
+        self._sock: Optional[socket.socket] = None
+        self._rx_buf = bytearray(self.RX_BUFFER_SIZE)
+
+    def __enter__(self) -> "MinerSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @overload
+    def call(self, request_obj: dict, raw: Literal[False] = ...) -> dict: ...
+    @overload
+    def call(self, request_obj: dict, raw: Literal[True]) -> bytes: ...
+    @overload
+    def call(self, request_obj: dict, raw: bool = ...) -> Union[dict, bytes]: ...
+
+    def call(self, request_obj: dict, raw: bool = False) -> Union[dict, bytes]:
+        """
+        Send request_obj over the session connection and return the parsed
+        response (or the response body bytes with raw=True).
+        """
+
+        frame = _encode_request(request_obj)
+        while True:
+            reused = self._sock is not None
+            if reused and (not _is_get_request(request_obj) or _is_stale(self._sock)):
+                self.close()
+                reused = False
+            if self._sock is None:
+                self._sock = _connect(self.host, self.port, self.timeout, self.sock_bufsize)
+                _enable_keepalive(self._sock)
+            sent = False
+            try:
+                self._sock.sendall(frame)
+                sent = True
+                resp_bytes = _recv_frame(self._sock, self._rx_buf)
+            except ConnectionError:
+                self.close()
+                if reused and _may_resend(request_obj, sent):
+                    continue  # kept connection was dead, retry on a fresh one
+                raise
+            except BaseException:
+                self.close()
+                raise
+            return bytes(resp_bytes) if raw else _parse_response(resp_bytes)
+
+    def close(self) -> None:
+        """Close the underlying connection (a later call reconnects)."""
+
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
 
+async def _send_request_and_receive_async(
+    host: str, port: int, request_obj: dict, timeout: int = DEFAULT_TIMEOUT
+) -> dict:
+    """Async counterpart of send_request_and_receive; timeout bounds the whole exchange."""
 
-_ENCRYPTED_COMMANDS = {"set.miner.pools", "set.user.change_passwd"}
+    frame = _encode_request(request_obj)
+
+    async def exchange() -> bytes:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(frame)
+            await writer.drain()
+            try:
+                header = await reader.readexactly(4)
+            except asyncio.IncompleteReadError:
+                raise ConnectionError("Failed to read response length") from None
+            resp_len = _LEN_STRUCT.unpack(header)[0]
+            if resp_len == 0:
+                return b""
+            try:
+                return await reader.readexactly(resp_len)
+            except asyncio.IncompleteReadError:
+                raise ConnectionError("Failed to read full response") from None
+        finally:
+            writer.close()
+
+    resp_bytes = await asyncio.wait_for(exchange(), timeout)
+    return _parse_response(resp_bytes)
+
+
+_ENCRYPTED_COMMANDS = frozenset({"set.miner.pools", "set.user.change_passwd"})
+
+# Command kinds: plain get, signed set.*, signed set.* with encrypted param
+_KIND_GET = 0
+_KIND_SET = 1
+_KIND_ENCRYPTED = 2
+
+# cmd -> kind, seeded with the encrypted commands and filled as commands are seen
+_CMD_KIND: Dict[str, int] = {c: _KIND_ENCRYPTED for c in _ENCRYPTED_COMMANDS}
+_CMD_KIND_MAX = 256
+
+
+def _command_kind(cmd: str) -> int:
+    """Return _KIND_GET, _KIND_SET or _KIND_ENCRYPTED for cmd."""
+
+    kind = _CMD_KIND.get(cmd)
+    if kind is None:
+        kind = _KIND_SET if cmd.startswith("set.") else _KIND_GET
+        if len(_CMD_KIND) < _CMD_KIND_MAX:
+            _CMD_KIND[cmd] = kind
+    return kind
+
+
+def _derive_and_encrypt(cmd: str, account_password: str, salt: str, ts: int, param_obj: Any) -> tuple[str, str]:
+    """
+    Return (token, encrypted_param_b64) for an encrypted set.* command.
+    Token and key derivation are memoized per (cmd, password, salt, ts), and the
+    AES key schedule per key, so retries at the same ts redo neither.
+    """
+
+    token, digest = generate_token(cmd, account_password, salt, ts)
+    return token, encrypt_param_aes_ecb_base64(param_obj, digest)
+
+
+def _build_request(
+    cmd: str,
+    account: str,
+    account_password: str,
+    param: Optional[Any],
+    salt: Optional[str],
+    ts: Optional[int],
+) -> Dict[str, Any]:
+    request: Dict[str, Any] = {"cmd": cmd}
+    kind = _command_kind(cmd)
+    if kind == _KIND_GET:
+        if param is not None:
+            request["param"] = param
+        return request
+
+    if salt is None:
+        raise ValueError("Salt is required for set.* commands. Obtain it via get.device.info (param: \"salt\").")
+    ts_val = ts if ts is not None else now_ts_int()
+    if kind == _KIND_ENCRYPTED:
+        if param is None:
+            raise ValueError(f"Command {cmd} requires 'param'.")
+        token, enc_b64 = _derive_and_encrypt(cmd, account_password, salt, ts_val, param)
+        request.update({"ts": ts_val, "token": token, "account": account, "param": enc_b64})
+        return request
+    token, _digest = generate_token(cmd, account_password, salt, ts_val)
+    request.update({"ts": ts_val, "token": token, "account": account})
+    if param is not None:
+        request["param"] = param
+    return request
 
 
 def call_whatsminer(
@@ -149,6 +720,7 @@ def call_whatsminer(
     salt: Optional[str] = None,
     ts: Optional[int] = None,
     timeout: int = DEFAULT_TIMEOUT,
+    session: Optional[MinerSession] = None,
 ) -> dict:
     """
     Generic caller for Whatsminer API.
@@ -156,39 +728,122 @@ def call_whatsminer(
       - ts and token are required and computed automatically
       - 'salt' must be known (typically from get.device.info 'salt')
       - Certain commands encrypt 'param' (see _ENCRYPTED_COMMANDS)
+    If session is given, the request is sent over its connection instead of
+    a new one to host:port.
     """
 
-    request: Dict[str, Any] = {"cmd": cmd}
-    is_set_cmd = cmd.startswith("set.")
-    ts_val = ts if ts is not None else (now_ts_int() if is_set_cmd else None)
-
-    if is_set_cmd:
-        if salt is None:
-            raise ValueError("Salt is required for set.* commands. Obtain it via get.device.info (param: \"salt\").")
-        token, sha256_digest = generate_token(cmd, account_password, salt, ts_val)
-        request.update({"ts": ts_val, "token": token, "account": account})
-        if cmd in _ENCRYPTED_COMMANDS:
-            if param is None:
-                raise ValueError(f"Command {cmd} requires 'param'.")
-            enc_b64 = encrypt_param_aes_ecb_base64(param, sha256_digest)
-            request["param"] = enc_b64
-        else:
-            if param is not None:
-                request["param"] = param
-    else:
-        if param is not None:
-            request["param"] = param
-
+    request = _build_request(cmd, account, account_password, param, salt, ts)
+    if session is not None:
+        return session.call(request)
     return send_request_and_receive(host, port, request, timeout=timeout)
 
 
+class WhatsminerClient:
+    """
+    Credentials plus a persistent MinerSession for one miner, for REPLs and
+    long-running tools issuing many commands.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        account: str = "super",
+        account_password: str = "",
+        timeout: int = DEFAULT_TIMEOUT,
+        sock_bufsize: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.account = account
+        self.account_password = account_password
+        self.timeout = timeout
+        self.session = MinerSession(host, port, timeout, sock_bufsize=sock_bufsize)
+
+    def __enter__(self) -> "WhatsminerClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def call(self, cmd: str, param: Optional[Any] = None, salt: Optional[str] = None, ts: Optional[int] = None) -> dict:
+        """Same as call_whatsminer, over the client's connection."""
+
+        return call_whatsminer(
+            self.host,
+            self.port,
+            self.account,
+            self.account_password,
+            cmd,
+            param,
+            salt=salt,
+            ts=ts,
+            timeout=self.timeout,
+            session=self.session,
+        )
+
+    @overload
+    def send(self, request_obj: dict, raw: Literal[False] = ...) -> dict: ...
+    @overload
+    def send(self, request_obj: dict, raw: Literal[True]) -> bytes: ...
+    @overload
+    def send(self, request_obj: dict, raw: bool = ...) -> Union[dict, bytes]: ...
+
+    def send(self, request_obj: dict, raw: bool = False) -> Union[dict, bytes]:
+        """Send an already built request over the client's connection (see MinerSession.call)."""
+
+        return self.session.call(request_obj, raw=raw)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+async def async_call_whatsminer(
+    host: str,
+    port: int,
+    account: str,
+    account_password: str,
+    cmd: str,
+    param: Optional[Any] = None,
+    salt: Optional[str] = None,
+    ts: Optional[int] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+) -> dict:
+    """
+    Async variant of call_whatsminer, for querying many miners concurrently
+    (e.g. with asyncio.gather).
+    """
+
+    request = _build_request(cmd, account, account_password, param, salt, ts)
+    return await _send_request_and_receive_async(host, port, request, timeout=timeout)
+
+
 def load_miner_conf(path: str = "miner-conf.json") -> dict:
     """Load miner configuration file if exists, else return {}."""
 
-    if not os.path.exists(path):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with f:
+        # stdlib json on purpose: hand-written files may use NaN/Infinity or big ints
+        return json.loads(f.read())
+
+
+# One pass classifies a numeric literal; the matching group picks the constructor.
+# Digit runs accept single underscores between digits, as Python literals do.
+_DIGITS = r"\d(?:_?\d)*"
+_SCALAR_RE = re.compile(
+    rf"(?P<int>[-+]?{_DIGITS})"
+    r"|(?P<hex>0[xX]_?[0-9a-fA-F](?:_?[0-9a-fA-F])*)"
+    rf"|(?P<float>[-+]?(?:(?:{_DIGITS}\.(?:{_DIGITS})?|\.{_DIGITS}|{_DIGITS})(?:[eE][-+]?{_DIGITS})?|(?i:inf|infinity|nan)))"
+)
+_SCALAR_CONVERTERS = {
+    "int": int,
+    "hex": lambda v: int(v, 16),
+    "float": float,
+}
+_SCALAR_KEYWORDS = {"true": True, "false": False, "null": None, "none": None}
 
 
 def parse_scalar(value: str) -> Any:
@@ -205,22 +860,11 @@ def parse_scalar(value: str) -> Any:
         return None
     v = value.strip()
     low = v.lower()
-    if low == "true":
-        return True
-    if low == "false":
-        return False
-    if low in ("null", "none"):
-        return None
-    try:
-        if v.startswith(("0x", "0X")):
-            return int(v, 16)
-        return int(v)
-    except ValueError:
-        pass
-    try:
-        return float(v)
-    except ValueError:
-        pass
+    if low in _SCALAR_KEYWORDS:
+        return _SCALAR_KEYWORDS[low]
+    m = _SCALAR_RE.fullmatch(v)
+    if m is not None:
+        return _SCALAR_CONVERTERS[m.lastgroup](v)
     return v
 
 
@@ -240,11 +884,13 @@ def resolve_param_inputs(param_scalar: Optional[str], param_json: Optional[str],
         except Exception as exc:  # pragma: no cover - input validation
             raise ValueError(f"Failed to parse --param-json: {exc}")
     if param_file is not None:
-        if not os.path.exists(param_file):
-            raise FileNotFoundError(f"Param file not found: {param_file}")
-        with open(param_file, "r", encoding="utf-8") as f:
+        try:
+            f = open(param_file, "rb")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Param file not found: {param_file}") from None
+        with f:
             try:
-                return json.load(f)
+                return json.loads(f.read())
             except Exception as exc:  # pragma: no cover - input validation
                 raise ValueError(f"Failed to parse param file JSON: {exc}")
     return None
@@ -253,10 +899,16 @@ def resolve_param_inputs(param_scalar: Optional[str], param_json: Optional[str],
 __all__ = [
     "DEFAULT_PORT",
     "DEFAULT_TIMEOUT",
+    "LARGE_RESPONSE_BUFSIZE",
+    "MinerSession",
+    "WhatsminerClient",
+    "async_call_whatsminer",
     "call_whatsminer",
+    "close_pooled_connections",
     "encrypt_param_aes_ecb_base64",
     "generate_token",
     "load_miner_conf",
+    "make_token_factory",
     "parse_scalar",
     "resolve_param_inputs",
     "send_request_and_receive",